@@ -1,30 +1,44 @@
-from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Depends, status, UploadFile, File, WebSocket, WebSocketDisconnect, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import jwt
 from jwt import PyJWTError
 import datetime
 import hashlib
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 import io
+import numpy as np
 import pandas as pd
 import google.generativeai as genai
 import uuid
 import os
 from dotenv import load_dotenv
 import json
+import random
+import threading
 
 load_dotenv() # Load environment variables from .env file
 
 # Import config and DB
-from config import GEMINI_API_KEY, REFRESH_TOKEN_SECRET_KEY, REFRESH_TOKEN_EXPIRE_MINUTES
+from config import (
+    GEMINI_API_KEY, REFRESH_TOKEN_SECRET_KEY, REFRESH_TOKEN_EXPIRE_MINUTES, COMPRESSION_MINIMUM_SIZE, METRICS_CACHE_MAX_ROWS,
+    HOT_WINDOW_HOURS, HOT_WINDOW_MAX_BYTES, HOT_WINDOW_SERIES_CAPACITY, DEFAULT_TENANT_ID, TENANT_DB_MODE,
+)
 from database import SessionLocal, engine
 import models
+from hot_window import HotWindow, MemoryBudget, to_epoch_us, from_epoch_us
+from quiz import seed_question_bank, bank_filters, bank_etag
+from response_cache import CompressionMiddleware, data_versions, memoize, not_modified
+from tenancy import migrate_tenant_columns, ensure_default_tenant, tenant_session
+from sqlalchemy import func, insert, or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 # Create DB tables
 models.Base.metadata.create_all(bind=engine)
+migrate_tenant_columns(engine)
 
 app = FastAPI(title="QualityBot AI Backend")
 
@@ -39,8 +53,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# ✅ Compress responses above the size threshold (brotli or gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE)
+
 # JWT Config
 SECRET_KEY = os.getenv("SECRET_KEY", "super-secret-default-key") # Load from environment, with a default fallback
 ALGORITHM = "HS256"
@@ -60,9 +78,11 @@ class UserSignup(BaseModel):
     email: str
     password: str
     role: str
+    plant: Optional[str] = None # Every signup starts a new tenant for its plant
 
 class TokenData(BaseModel):
     user_id: Optional[str] = None
+    tenant_id: Optional[str] = None
 
 class RefreshTokenData(BaseModel):
     refresh_token: str
@@ -72,9 +92,25 @@ class UserResponse(BaseModel):
     name: str
     email: str
     role: str
+    tenant_id: Optional[str] = None
     access_token: str
     refresh_token: str
 
+class BulkUserRequest(BaseModel):
+    users: List[dict] # Validated row by row, so one bad row doesn't reject the upload
+
+class BulkUserResult(BaseModel):
+    row: int
+    email: Optional[str] = None
+    success: bool
+    detail: Optional[str] = None
+    user: Optional[UserResponse] = None
+
+class BulkUserResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkUserResult]
+
 class QualityData(BaseModel):
     timestamp: str
     metric_name: str
@@ -91,6 +127,59 @@ class ExcelImportResponse(BaseModel):
     imported_rows: int
     sample_data: List[dict]
 
+class MetricPoint(BaseModel):
+    timestamp: str
+    metric_name: str
+    value: float
+    target: float
+    unit: str
+    process: str
+    operator: str
+
+class MetricsResponse(BaseModel):
+    rows: List[MetricPoint]
+    memory_rows: int
+    database_rows: int
+
+class QuizQuestionOut(BaseModel):
+    id: int
+    topic: str
+    language: str
+    difficulty: str
+    question: str
+    options: List[str]
+
+class QuizQuestionPage(BaseModel):
+    questions: List[QuizQuestionOut]
+    next_cursor: Optional[int] = None
+
+class QuizBank(BaseModel):
+    topic: str
+    language: str
+    difficulty: str
+    questions: int
+
+class QuizAnswer(BaseModel):
+    question_id: int
+    answer: int = Field(ge=0)
+
+class QuizAttemptRequest(BaseModel):
+    answers: List[QuizAnswer]
+    time_taken: int = Field(ge=0)
+
+class QuizAnswerResult(BaseModel):
+    question_id: int
+    answer: int
+    correct_answer: int
+    correct: bool
+    explanation: str
+
+class QuizAttemptResponse(BaseModel):
+    id: str
+    score: int
+    total: int
+    results: List[QuizAnswerResult]
+
 class ChatRequest(BaseModel):
     prompt: str
     user_role: Optional[str] = None # Added user_role for context
@@ -106,25 +195,86 @@ class ChatResponse(BaseModel):
 # ----------------------------
 
 class ConnectionManager:
+    # One topic per tenant, so broadcasts never reach another plant
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Dict[str, List[WebSocket]] = {}
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, tenant_id: str):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.setdefault(tenant_id, []).append(websocket)
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+    def disconnect(self, websocket: WebSocket, tenant_id: str):
+        connections = self.active_connections.get(tenant_id, [])
+        if websocket in connections:
+            connections.remove(websocket)
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+    async def broadcast(self, message: str, tenant_id: str):
+        # A client that went away mid-broadcast is dropped, the others still get the message
+        for connection in list(self.active_connections.get(tenant_id, [])):
+            try:
+                await connection.send_text(message)
+            except Exception:
+                self.disconnect(connection, tenant_id)
 
 manager = ConnectionManager()
 
+# One hot window per tenant, all sharing HOT_WINDOW_MAX_BYTES with an equal share guaranteed to each
+hot_window_budget = MemoryBudget(HOT_WINDOW_MAX_BYTES)
+hot_windows: Dict[str, HotWindow] = {}
+hot_windows_lock = threading.Lock()
+
+def get_hot_window(db: Session, tenant_id: str) -> HotWindow:
+    # Tenants created after startup get their window on first use, warmed
+    # from their own rows so it covers the full HOT_WINDOW_HOURS
+    window = hot_windows.get(tenant_id)
+    if window is None:
+        with hot_windows_lock:
+            window = hot_windows.get(tenant_id)
+            if window is None:
+                window = HotWindow(HOT_WINDOW_HOURS, hot_window_budget, HOT_WINDOW_SERIES_CAPACITY)
+                fill_hot_window(db, tenant_id, window)
+                hot_windows[tenant_id] = window
+    return window
+
+METRIC_COLUMNS = (
+    models.QualityMeasurement.timestamp,
+    models.QualityMeasurement.metric_name,
+    models.QualityMeasurement.value,
+    models.QualityMeasurement.target,
+    models.QualityMeasurement.unit,
+    models.QualityMeasurement.process,
+    models.QualityMeasurement.operator,
+)
+
+def parse_timestamp(value) -> Optional[datetime.datetime]:
+    # Naive UTC, matching the quality_measurements column
+    ts = pd.to_datetime(value, utc=True, errors="coerce")
+    if pd.isna(ts):
+        return None
+    return ts.tz_localize(None).to_pydatetime()
+
+def warm_hot_window(db: Session, tenant_id: str):
+    with hot_windows_lock:
+        window = hot_windows.get(tenant_id)
+        if window is None:
+            window = HotWindow(HOT_WINDOW_HOURS, hot_window_budget, HOT_WINDOW_SERIES_CAPACITY)
+        fill_hot_window(db, tenant_id, window)
+        hot_windows[tenant_id] = window
+
+def fill_hot_window(db: Session, tenant_id: str, window: HotWindow):
+    since = datetime.datetime.utcnow() - datetime.timedelta(hours=HOT_WINDOW_HOURS)
+    window.reset(since)
+    result = db.execute(
+        select(*METRIC_COLUMNS)
+        .where(models.QualityMeasurement.tenant_id == tenant_id, models.QualityMeasurement.timestamp >= since)
+        .execution_options(yield_per=10000)
+    )
+    for chunk in result.mappings().partitions():
+        window.append(chunk)
+
 def hash_password(password: str) -> str:
     return hashlib.sha256(password.encode()).hexdigest()
 
@@ -138,6 +288,9 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def token_claims(user: models.User) -> dict:
+    return {"sub": user.id, "tenant": user.tenant_id}
+
 def create_refresh_token(data: dict):
     to_encode = data.copy()
     expire = datetime.datetime.utcnow() + datetime.timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES)
@@ -153,6 +306,67 @@ def get_db():
     finally:
         db.close()
 
+# Roles allowed to provision users in bulk for their plant
+PROVISIONING_ROLES = {"msme", "engineer"}
+
+def provision_users(db: Session, rows: List[dict], tenant_id: str) -> BulkUserResponse:
+    """Create many users in a tenant with one existence query and one batched insert."""
+    results = []
+    valid = []
+    for i, row in enumerate(rows):
+        try:
+            valid.append((i, UserSignup(**row)))
+        except Exception as e:
+            email = row.get("email") if isinstance(row.get("email"), str) else None
+            results.append(BulkUserResult(row=i, email=email, success=False, detail=f"Invalid row: {e}"))
+
+    emails = {user.email for _, user in valid}
+    existing = set(db.execute(select(models.User.email).where(models.User.email.in_(emails))).scalars()) if emails else set()
+
+    new_users = []
+    seen = set()
+    for i, user in valid:
+        if user.email in existing:
+            results.append(BulkUserResult(row=i, email=user.email, success=False, detail="Email already registered"))
+        elif user.email in seen:
+            results.append(BulkUserResult(row=i, email=user.email, success=False, detail="Duplicate email in upload"))
+        else:
+            seen.add(user.email)
+            new_users.append((i, user))
+
+    # sha256 is cheap enough that a single pass beats farming it out to workers
+    hashed = [hash_password(user.password) for _, user in new_users]
+    records = [
+        {"id": str(uuid.uuid4()), "name": user.name, "email": user.email, "password": password, "role": user.role, "tenant_id": tenant_id}
+        for (_, user), password in zip(new_users, hashed)
+    ]
+    if records:
+        try:
+            db.execute(insert(models.User), records)
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Some emails were registered during provisioning, please retry")
+
+    for (i, user), record in zip(new_users, records):
+        results.append(BulkUserResult(
+            row=i,
+            email=user.email,
+            success=True,
+            user=UserResponse(
+                id=record["id"],
+                name=user.name,
+                email=user.email,
+                role=user.role,
+                tenant_id=tenant_id,
+                access_token=create_access_token(data={"sub": record["id"], "tenant": tenant_id}),
+                refresh_token=create_refresh_token(data={"sub": record["id"], "tenant": tenant_id}),
+            ),
+        ))
+
+    results.sort(key=lambda r: r.row)
+    return BulkUserResponse(created=len(records), failed=len(results) - len(records), results=results)
+
 # JWT Verification
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
@@ -160,7 +374,7 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token", headers={"WWW-Authenticate": "Bearer"})
-        return TokenData(user_id=user_id)
+        return TokenData(user_id=user_id, tenant_id=payload.get("tenant") or DEFAULT_TENANT_ID)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired", headers={"WWW-Authenticate": "Bearer"})
     except PyJWTError:
@@ -172,30 +386,65 @@ def verify_refresh_token(credentials: HTTPAuthorizationCredentials = Depends(sec
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid refresh token", headers={"WWW-Authenticate": "Bearer"})
-        return TokenData(user_id=user_id)
+        return TokenData(user_id=user_id, tenant_id=payload.get("tenant") or DEFAULT_TENANT_ID)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Refresh token expired", headers={"WWW-Authenticate": "Bearer"})
     except PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid refresh token", headers={"WWW-Authenticate": "Bearer"})
 
+# Dependency to get the DB session holding the caller's tenant data
+def get_tenant_db(token_data: TokenData = Depends(verify_token), db: Session = Depends(get_db)):
+    if TENANT_DB_MODE != "sqlite":
+        yield db
+        return
+    tenant_db = tenant_session(token_data.tenant_id)
+    try:
+        yield tenant_db
+    finally:
+        tenant_db.close()
+
 # ----------------------------
 # Routes
 # ----------------------------
 
+@app.on_event("startup")
+def load_default_tenant():
+    # Hot windows are warmed on first use by get_hot_window, so startup time
+    # does not grow with the number of tenants
+    db = SessionLocal()
+    try:
+        ensure_default_tenant(db)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def load_quiz_bank():
+    db = SessionLocal()
+    try:
+        seed_question_bank(db)
+    finally:
+        db.close()
+
 @app.get("/")
 async def root():
     return {"message": "QualityBot AI Backend is running!"}
 
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket, token: Optional[str] = None):
+    try:
+        tenant_id = verify_token(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token or "")).tenant_id
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await manager.connect(websocket, tenant_id)
     try:
         while True:
             data = await websocket.receive_text()
             # Optionally, handle incoming WebSocket messages if needed
             # await manager.send_personal_message(f"You sent: {data}", websocket)
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        manager.disconnect(websocket, tenant_id)
         print("Client disconnected from WebSocket")
 
 @app.post("/refresh", response_model=UserResponse)
@@ -208,13 +457,14 @@ async def refresh_token(refresh_token_data: RefreshTokenData, db: Session = Depe
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
-        new_access_token = create_access_token(data={"sub": user.id})
+        new_access_token = create_access_token(data=token_claims(user))
         
         return UserResponse(
             id=user.id,
             name=user.name,
             email=user.email,
             role=user.role,
+            tenant_id=user.tenant_id,
             access_token=new_access_token,
             refresh_token=refresh_token_data.refresh_token
         )
@@ -226,6 +476,11 @@ async def refresh_token(refresh_token_data: RefreshTokenData, db: Session = Depe
 # ✅ Signup
 @app.post("/signup", response_model=UserResponse)
 async def signup(user_data: UserSignup, db: Session = Depends(get_db)):
+    # Open signup always starts a new tenant; joining an existing plant goes
+    # through bulk provisioning by that plant's owner or engineer
+    if not user_data.plant or not user_data.plant.strip():
+        raise HTTPException(status_code=400, detail="Plant name is required")
+
     existing_user = db.query(models.User).filter(models.User.email == user_data.email).first()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
@@ -233,30 +488,65 @@ async def signup(user_data: UserSignup, db: Session = Depends(get_db)):
     user_id = str(uuid.uuid4())
     hashed_password = hash_password(user_data.password)
 
+    tenant_id = uuid.uuid4().hex
+    db.add(models.Tenant(id=tenant_id, name=user_data.plant.strip()))
+
     new_user = models.User(
         id=user_id,
         name=user_data.name,
         email=user_data.email,
         password=hashed_password,
-        role=user_data.role
+        role=user_data.role,
+        tenant_id=tenant_id
     )
 
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
 
-    access_token = create_access_token(data={"sub": new_user.id})
-    refresh_token = create_refresh_token(data={"sub": new_user.id})
+    access_token = create_access_token(data=token_claims(new_user))
+    refresh_token = create_refresh_token(data=token_claims(new_user))
 
     return UserResponse(
         id=new_user.id,
         name=new_user.name,
         email=new_user.email,
         role=new_user.role,
+        tenant_id=new_user.tenant_id,
         access_token=access_token,
         refresh_token=refresh_token
     )
 
+# ✅ Bulk User Provisioning
+def require_provisioner(token_data: TokenData = Depends(verify_token), db: Session = Depends(get_db)):
+    user = db.query(models.User).filter(models.User.id == token_data.user_id).first()
+    if not user or user.role not in PROVISIONING_ROLES:
+        raise HTTPException(status_code=403, detail="Not allowed to provision users")
+    return user
+
+@app.post("/users/bulk", response_model=BulkUserResponse)
+async def bulk_create_users(request: BulkUserRequest, provisioner: models.User = Depends(require_provisioner), db: Session = Depends(get_db)):
+    return provision_users(db, request.users, provisioner.tenant_id)
+
+@app.post("/users/bulk/import", response_model=BulkUserResponse)
+async def bulk_import_users(file: UploadFile = File(...), provisioner: models.User = Depends(require_provisioner), db: Session = Depends(get_db)):
+    if not (file.filename.endswith('.csv') or file.filename.endswith('.xlsx')):
+        raise HTTPException(status_code=400, detail="Only .csv and .xlsx files are supported")
+
+    content = await file.read()
+    try:
+        if file.filename.endswith('.csv'):
+            df = pd.read_csv(io.StringIO(content.decode('utf-8')), dtype=str)
+        else:
+            df = pd.read_excel(io.BytesIO(content), dtype=str)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"File parse error: {str(e)}")
+
+    rows = df.where(df.notna(), None).to_dict(orient="records")
+    if not rows:
+        raise HTTPException(status_code=400, detail="No users found in file")
+    return provision_users(db, rows, provisioner.tenant_id)
+
 # ✅ Login
 @app.post("/login", response_model=UserResponse)
 async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
@@ -264,14 +554,15 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     if not user or not verify_password(user_credentials.password, user.password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    access_token = create_access_token(data={"sub": user.id})
-    refresh_token = create_refresh_token(data={"sub": user.id})
+    access_token = create_access_token(data=token_claims(user))
+    refresh_token = create_refresh_token(data=token_claims(user))
 
     return UserResponse(
         id=user.id,
         name=user.name,
         email=user.email,
         role=user.role,
+        tenant_id=user.tenant_id,
         access_token=access_token,
         refresh_token=refresh_token
     )
@@ -287,12 +578,13 @@ async def verify_token_endpoint(token_data: TokenData = Depends(verify_token), d
         "id": user.id,
         "name": user.name,
         "email": user.email,
-        "role": user.role
+        "role": user.role,
+        "tenant_id": user.tenant_id
     }
 
 # ✅ Excel/CSV Import
 @app.post("/import-excel", response_model=ExcelImportResponse)
-async def import_excel_data(file: UploadFile = File(...)):
+async def import_excel_data(file: UploadFile = File(...), token_data: TokenData = Depends(verify_token), db: Session = Depends(get_tenant_db)):
     if not (file.filename.endswith('.csv') or file.filename.endswith('.xlsx')):
         raise HTTPException(status_code=400, detail="Only .csv and .xlsx files are supported")
 
@@ -306,6 +598,7 @@ async def import_excel_data(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail=f"File parse error: {str(e)}")
 
     imported_data = []
+    measurements = []
     for _, row in df.iterrows():
         try:
             quality_data = QualityData(
@@ -321,16 +614,20 @@ async def import_excel_data(file: UploadFile = File(...)):
             imported_data.append(quality_data.dict())
         except Exception:
             continue
+        measurement = quality_data.dict()
+        measurement["tenant_id"] = token_data.tenant_id
+        measurement["timestamp"] = parse_timestamp(quality_data.timestamp) or datetime.datetime.utcnow()
+        measurements.append(measurement)
 
     if not imported_data:
         raise HTTPException(status_code=400, detail="No valid data found in file")
 
-    return ExcelImportResponse(
-        success=True,
-        message=f"Successfully imported {len(imported_data)} quality data records",
-        imported_rows=len(imported_data),
-        sample_data=imported_data[:5]
-    )
+    # Fetch the window before inserting, a freshly warmed one must not see these rows twice
+    window = get_hot_window(db, token_data.tenant_id)
+    db.execute(insert(models.QualityMeasurement), measurements)
+    db.commit()
+    window.append(measurements)
+    data_versions.bump(f"measurements:{token_data.tenant_id}")
 
     # Broadcast update to WebSocket clients
     await manager.broadcast(json.dumps({
@@ -339,7 +636,263 @@ async def import_excel_data(file: UploadFile = File(...)):
         "message": f"Successfully imported {len(imported_data)} quality data records",
         "imported_rows": len(imported_data),
         "sample_data": imported_data[:5]
-    }))
+    }), token_data.tenant_id)
+
+    return ExcelImportResponse(
+        success=True,
+        message=f"Successfully imported {len(imported_data)} quality data records",
+        imported_rows=len(imported_data),
+        sample_data=imported_data[:5]
+    )
+
+# ✅ Dashboard Metrics
+MINUTE_US = 60 * 1000 * 1000
+
+# Only the DB part is memoized: hot window reads are cheap, and caching them
+# would keep a fresh copy of the recent rows for every minute a dashboard polls
+@memoize("measurements:{tenant_id}", weigh=len, max_weight=METRICS_CACHE_MAX_ROWS)
+def query_metrics_db(
+    db: Session,
+    tenant_id: str,
+    process: Optional[str],
+    metric_name: Optional[str],
+    operator: Optional[str],
+    start_ts: datetime.datetime,
+    end_ts: Optional[datetime.datetime],
+    cutoff_ts: Optional[datetime.datetime],
+    uncovered: Tuple[Tuple[str, str], ...],
+) -> List[dict]:
+    # Rows before cutoff_ts, plus the uncovered series over the whole range
+    from_db = []
+    if cutoff_ts is not None:
+        from_db.append(models.QualityMeasurement.timestamp < cutoff_ts)
+    if uncovered:
+        from_db.append(tuple_(models.QualityMeasurement.process, models.QualityMeasurement.metric_name).in_(uncovered))
+    query = select(*METRIC_COLUMNS).where(
+        models.QualityMeasurement.tenant_id == tenant_id,
+        models.QualityMeasurement.timestamp >= start_ts,
+        or_(*from_db),
+    )
+    if end_ts is not None:
+        query = query.where(models.QualityMeasurement.timestamp <= end_ts)
+    if process is not None:
+        query = query.where(models.QualityMeasurement.process == process)
+    if metric_name is not None:
+        query = query.where(models.QualityMeasurement.metric_name == metric_name)
+    if operator is not None:
+        query = query.where(models.QualityMeasurement.operator == operator)
+
+    rows = []
+    for row in db.execute(query.order_by(models.QualityMeasurement.timestamp)).mappings():
+        point = dict(row)
+        point["timestamp"] = point["timestamp"].replace(tzinfo=datetime.timezone.utc).isoformat()
+        rows.append(point)
+    return rows
+
+def query_metrics(
+    db: Session,
+    tenant_id: str,
+    process: Optional[str],
+    metric_name: Optional[str],
+    operator: Optional[str],
+    start_ts: datetime.datetime,
+    end_ts: Optional[datetime.datetime],
+) -> dict:
+    start_us = to_epoch_us(start_ts)
+    end_us = to_epoch_us(end_ts) if end_ts is not None else np.iinfo(np.int64).max
+    window = get_hot_window(db, tenant_id)
+    # Rounded up to the minute so the memoized DB part keeps its key between
+    # polls; the window holds every row from the exact cutoff, so this is safe
+    cutoff_us = -(-window.cutoff(process, metric_name) // MINUTE_US) * MINUTE_US
+    uncovered = tuple(window.uncovered_series(process, metric_name))
+
+    # Older part of the range comes from the DB, the rest from the hot window;
+    # series the window had no room for are read from the DB over the whole range
+    db_rows = []
+    if start_us < cutoff_us or uncovered:
+        cutoff_ts = from_epoch_us(cutoff_us).replace(tzinfo=None) if start_us < cutoff_us else None
+        db_rows = query_metrics_db(
+            db, tenant_id, process, metric_name, operator, start_ts, end_ts, cutoff_ts, uncovered
+        )
+
+    memory_rows = []
+    if end_us >= cutoff_us:
+        memory_rows = window.query(max(start_us, cutoff_us), end_us, process, metric_name, operator)
+
+    rows = db_rows + memory_rows
+    if uncovered and db_rows and memory_rows:
+        rows.sort(key=lambda row: datetime.datetime.fromisoformat(row["timestamp"]))
+
+    return {
+        "rows": rows,
+        "memory_rows": len(memory_rows),
+        "database_rows": len(db_rows),
+    }
+
+@app.get("/metrics", response_model=MetricsResponse, response_class=ORJSONResponse)
+async def get_metrics(
+    request: Request,
+    process: Optional[str] = None,
+    metric_name: Optional[str] = None,
+    operator: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    token_data: TokenData = Depends(verify_token),
+    db: Session = Depends(get_tenant_db),
+):
+    # Without an explicit range, serve the last 24h up to now; the start is
+    # rounded to the minute so repeated polls share an ETag and cache entry
+    end_ts = parse_timestamp(end) if end else None
+    if start:
+        start_ts = parse_timestamp(start)
+    else:
+        start_ts = (end_ts or datetime.datetime.utcnow()).replace(second=0, microsecond=0) - datetime.timedelta(hours=24)
+    if start_ts is None or (end and end_ts is None):
+        raise HTTPException(status_code=400, detail="Invalid start or end timestamp")
+
+    tenant_id = token_data.tenant_id
+    etag = data_versions.etag([f"measurements:{tenant_id}"], tenant_id, process, metric_name, operator, start_ts, end_ts)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    payload = query_metrics(db, tenant_id, process, metric_name, operator, start_ts, end_ts)
+    return ORJSONResponse(payload, headers=headers)
+
+# ✅ Quiz Question Banks
+QUIZ_CACHE_CONTROL = "public, max-age=300"
+
+@app.get("/quiz/banks", response_model=List[QuizBank])
+async def list_quiz_banks(response: Response, db: Session = Depends(get_db)):
+    rows = db.query(
+        models.QuizQuestion.topic,
+        models.QuizQuestion.language,
+        models.QuizQuestion.difficulty,
+        func.count(models.QuizQuestion.id),
+    ).group_by(
+        models.QuizQuestion.topic, models.QuizQuestion.language, models.QuizQuestion.difficulty
+    ).all()
+    response.headers["Cache-Control"] = QUIZ_CACHE_CONTROL
+    return [
+        QuizBank(topic=topic, language=language, difficulty=difficulty, questions=count)
+        for topic, language, difficulty, count in rows
+    ]
+
+@app.get("/quiz/questions", response_model=QuizQuestionPage)
+async def get_quiz_questions(
+    request: Request,
+    response: Response,
+    topic: Optional[str] = None,
+    language: str = "en",
+    difficulty: Optional[str] = None,
+    cursor: int = 0,
+    limit: int = 20,
+    db: Session = Depends(get_db),
+):
+    limit = max(1, min(limit, 100))
+    filters = bank_filters(topic, language, difficulty)
+    etag = bank_etag(db, filters, topic, language, difficulty, cursor, limit)
+    if not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": QUIZ_CACHE_CONTROL})
+
+    # Keyset pagination on id, correct answers stay on the server
+    questions = db.query(models.QuizQuestion).filter(
+        *filters, models.QuizQuestion.id > cursor
+    ).order_by(models.QuizQuestion.id).limit(limit + 1).all()
+    next_cursor = questions[limit - 1].id if len(questions) > limit else None
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = QUIZ_CACHE_CONTROL
+    return QuizQuestionPage(
+        questions=[
+            QuizQuestionOut(
+                id=q.id,
+                topic=q.topic,
+                language=q.language,
+                difficulty=q.difficulty,
+                question=q.question,
+                options=q.options,
+            )
+            for q in questions[:limit]
+        ],
+        next_cursor=next_cursor,
+    )
+
+@app.get("/quiz/sample", response_model=List[QuizQuestionOut])
+async def sample_quiz_questions(
+    response: Response,
+    topic: Optional[str] = None,
+    language: str = "en",
+    difficulty: Optional[str] = None,
+    count: int = 5,
+    db: Session = Depends(get_db),
+):
+    count = max(1, min(count, 20))
+    # Pick ids from the covering bank index, then load only the chosen rows
+    ids = db.execute(select(models.QuizQuestion.id).where(*bank_filters(topic, language, difficulty))).scalars().all()
+    chosen = random.sample(ids, min(count, len(ids)))
+    questions = {q.id: q for q in db.query(models.QuizQuestion).filter(models.QuizQuestion.id.in_(chosen))}
+
+    response.headers["Cache-Control"] = "no-store"
+    return [
+        QuizQuestionOut(
+            id=q.id,
+            topic=q.topic,
+            language=q.language,
+            difficulty=q.difficulty,
+            question=q.question,
+            options=q.options,
+        )
+        for q in (questions[question_id] for question_id in chosen)
+    ]
+
+@app.post("/quiz/attempts", response_model=QuizAttemptResponse)
+async def submit_quiz_attempt(
+    attempt: QuizAttemptRequest,
+    token_data: TokenData = Depends(verify_token),
+    db: Session = Depends(get_db),
+    tenant_db: Session = Depends(get_tenant_db),
+):
+    if not attempt.answers:
+        raise HTTPException(status_code=400, detail="No answers submitted")
+
+    # Score every answer against a single IN query
+    question_ids = {a.question_id for a in attempt.answers}
+    if len(question_ids) != len(attempt.answers):
+        raise HTTPException(status_code=400, detail="Duplicate question id")
+    questions = {
+        q.id: q for q in db.query(models.QuizQuestion).filter(models.QuizQuestion.id.in_(question_ids))
+    }
+    if len(questions) != len(question_ids):
+        raise HTTPException(status_code=400, detail="Unknown question id")
+    if any(a.answer >= len(questions[a.question_id].options) for a in attempt.answers):
+        raise HTTPException(status_code=400, detail="Answer out of range")
+
+    results = [
+        QuizAnswerResult(
+            question_id=a.question_id,
+            answer=a.answer,
+            correct_answer=questions[a.question_id].correct_answer,
+            correct=a.answer == questions[a.question_id].correct_answer,
+            explanation=questions[a.question_id].explanation,
+        )
+        for a in attempt.answers
+    ]
+    score = sum(r.correct for r in results)
+
+    attempt_id = str(uuid.uuid4())
+    tenant_db.add(models.QuizAttempt(
+        id=attempt_id,
+        tenant_id=token_data.tenant_id,
+        user_id=token_data.user_id,
+        score=score,
+        total=len(results),
+        time_taken=attempt.time_taken,
+        created_at=datetime.datetime.utcnow(),
+    ))
+    tenant_db.commit()
+
+    return QuizAttemptResponse(id=attempt_id, score=score, total=len(results), results=results)
 
 # ✅ Gemini Chat
 @app.post("/chat", response_model=ChatResponse)
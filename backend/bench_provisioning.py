@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark bulk user provisioning against one-at-a-time /signup
+Runs in-process against a throwaway SQLite database: python bench_provisioning.py [users]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import app, get_db
+from database import Base
+
+def make_users(prefix, count):
+    return [
+        {"name": f"Operator {i}", "email": f"{prefix}{i}@plant.example", "password": f"pass-{i}", "role": "student"}
+        for i in range(count)
+    ]
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+    app.dependency_overrides[get_db] = override_get_db
+
+    client = TestClient(app)
+    admin = client.post("/signup", json={"name": "Owner", "email": "owner@plant.example", "password": "owner", "role": "msme", "plant": "Bench Plant"}).json()
+    headers = {"Authorization": f"Bearer {admin['access_token']}"}
+
+    print(f"🚀 Provisioning {count} users\n")
+
+    start = time.perf_counter()
+    for user in make_users("single", count):
+        client.post("/signup", json={**user, "plant": "Bench Plant"})
+    single = time.perf_counter() - start
+    print(f"   /signup one at a time: {single:.2f}s ({count / single:.0f} users/s)")
+
+    start = time.perf_counter()
+    response = client.post("/users/bulk", json={"users": make_users("bulk", count)}, headers=headers)
+    bulk = time.perf_counter() - start
+    print(f"   /users/bulk:           {bulk:.2f}s ({count / bulk:.0f} users/s), created {response.json()['created']}")
+
+    print(f"\n✨ Bulk provisioning is {single / bulk:.1f}x faster")
+    app.dependency_overrides.clear()
+
+if __name__ == "__main__":
+    main()
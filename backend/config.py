@@ -16,3 +16,22 @@ BACKEND_PORT = int(os.getenv("BACKEND_PORT", 8000))
 # For JWT token management
 REFRESH_TOKEN_SECRET_KEY = os.getenv("REFRESH_TOKEN_SECRET_KEY", "super-secret-refresh-key")
 REFRESH_TOKEN_EXPIRE_MINUTES = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", 43200)) # Default to 30 days
+
+# In-memory hot window serving recent dashboard metric queries
+HOT_WINDOW_HOURS = int(os.getenv("HOT_WINDOW_HOURS", 24 * 7))
+HOT_WINDOW_MAX_BYTES = int(os.getenv("HOT_WINDOW_MAX_BYTES", 64 * 1024 * 1024))
+HOT_WINDOW_SERIES_CAPACITY = int(os.getenv("HOT_WINDOW_SERIES_CAPACITY", 50000))
+
+# Responses smaller than this (bytes) are sent uncompressed
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024))
+
+# Total rows kept across memoized /metrics database results
+METRICS_CACHE_MAX_ROWS = int(os.getenv("METRICS_CACHE_MAX_ROWS", 100000))
+
+# Multi-tenant routing: "shared" scopes one database by tenant_id,
+# "sqlite" keeps each tenant's data tables in its own file
+DEFAULT_TENANT_ID = os.getenv("DEFAULT_TENANT_ID", "default")
+TENANT_DB_MODE = os.getenv("TENANT_DB_MODE", "shared")
+TENANT_SQLITE_DIR = os.getenv("TENANT_SQLITE_DIR", "./tenants")
+# Per-tenant SQLite engines kept open at once in "sqlite" mode
+TENANT_ENGINE_CACHE_SIZE = int(os.getenv("TENANT_ENGINE_CACHE_SIZE", 64))
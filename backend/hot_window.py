@@ -0,0 +1,421 @@
+import threading
+import datetime
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# In-process hot window for recent quality measurements.
+#
+# Dashboards mostly poll the last 24h-7d per process, so recent rows are kept
+# in per-series ring buffers (one series per process/metric pair) and filtered
+# with NumPy instead of going to the DB on every poll. Strings are dictionary
+# encoded to small ints; the window is only authoritative from `cutoff()`
+# onwards, older ranges must be read from the database. Rows that age out of
+# the window are dropped and their buffers shrunk, so the bytes go back to
+# the budget for series that need them.
+#
+# The window is per process: with several uvicorn workers each one only sees
+# the rows ingested through it, so run a single worker or warm on startup.
+# Windows of different tenants draw from one MemoryBudget, so the byte cap
+# holds for the whole process however many tenants there are, and each one is
+# guaranteed an equal share so an early, large plant cannot crowd out the rest.
+
+_MIN_CAPACITY = 64
+
+# timestamp int64 + value/target float64 + operator/unit int32
+ROW_BYTES = 8 + 8 + 8 + 4 + 4
+
+# How often appends and reads drop rows that aged out of the window
+EXPIRE_INTERVAL_US = 60 * 1000 * 1000
+
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+# Timestamps are kept as epoch microseconds, the same precision as the DB
+# column, so rows read from memory and from the DB compare and format alike
+def to_epoch_us(ts: datetime.datetime) -> int:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=datetime.timezone.utc)
+    return (ts - _EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(us: int) -> datetime.datetime:
+    return _EPOCH + datetime.timedelta(microseconds=us)
+
+
+class MemoryBudget:
+    """Byte cap shared by every window that draws from it.
+
+    Windows may use spare bytes freely, but once the cap is reached a window
+    still under its equal share takes room back from the windows furthest
+    over theirs, which evict their coldest series.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.windows = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def register(self, window: "HotWindow"):
+        with self._lock:
+            self.windows.add(window)
+
+    def share(self) -> int:
+        return self.max_bytes // max(len(self.windows), 1)
+
+    def reserve(self, window: "HotWindow", nbytes: int) -> bool:
+        with self._lock:
+            if self.used + nbytes <= self.max_bytes:
+                self.used += nbytes
+                return True
+            share = self.share()
+            if window.nbytes + nbytes > share:
+                return False
+            over = sorted(
+                (other for other in self.windows if other is not window and other.nbytes > share),
+                key=lambda other: other.nbytes,
+                reverse=True,
+            )
+        # Evict outside the budget lock, the other windows reserve while holding theirs
+        for other in over:
+            other.shrink_to(share)
+            with self._lock:
+                if self.used + nbytes <= self.max_bytes:
+                    self.used += nbytes
+                    return True
+        return False
+
+    def release(self, nbytes: int):
+        with self._lock:
+            self.used -= nbytes
+
+
+class _Dictionary:
+    """Maps strings to small integer codes and back."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def encode(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            code = len(self.names)
+            self.codes[name] = code
+            self.names.append(name)
+        return code
+
+    def lookup(self, name: str) -> Optional[int]:
+        return self.codes.get(name)
+
+
+class _Series:
+    """Ring buffer of measurements for one process/metric pair."""
+
+    def __init__(self, capacity: int):
+        self.ts = np.empty(capacity, dtype=np.int64)
+        self.value = np.empty(capacity, dtype=np.float64)
+        self.target = np.empty(capacity, dtype=np.float64)
+        self.operator = np.empty(capacity, dtype=np.int32)
+        self.unit = np.empty(capacity, dtype=np.int32)
+        self.size = 0
+        self.head = 0  # next slot to write once the ring is full
+        # Every row with ts >= floor is still held; raised when rows are overwritten
+        self.floor = np.iinfo(np.int64).min
+
+    @property
+    def capacity(self) -> int:
+        return len(self.ts)
+
+    @property
+    def nbytes(self) -> int:
+        return self.capacity * ROW_BYTES
+
+    def grow(self, capacity: int):
+        # Slot order doesn't matter, queries sort by timestamp
+        for name in ("ts", "value", "target", "operator", "unit"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def newest(self) -> int:
+        return int(self.ts[:self.size].max()) if self.size else np.iinfo(np.int64).min
+
+    def drop_before(self, horizon: int):
+        """Drop rows older than `horizon` and shrink the buffers to fit the rest."""
+        ts = self.ts[:self.size]
+        keep = np.flatnonzero(ts >= horizon)
+        if len(keep) == self.size:
+            return
+        # Oldest first, so the ring overwrites in timestamp order once full again
+        keep = keep[np.argsort(ts[keep], kind="stable")]
+        capacity = self.capacity
+        while capacity // 2 >= max(len(keep), _MIN_CAPACITY):
+            capacity //= 2
+        for name in ("ts", "value", "target", "operator", "unit"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:len(keep)] = old[keep]
+            setattr(self, name, new)
+        self.size = len(keep)
+        self.head = 0
+        self.floor = max(self.floor, horizon)
+
+    def append(self, ts: int, value: float, target: float, operator: int, unit: int):
+        if self.size < self.capacity:
+            i = self.size
+            self.size += 1
+        else:
+            i = self.head
+            self.floor = max(self.floor, int(self.ts[i]) + 1)
+            self.head = (self.head + 1) % self.capacity
+        self.ts[i] = ts
+        self.value[i] = value
+        self.target[i] = target
+        self.operator[i] = operator
+        self.unit[i] = unit
+
+    def select(self, start: int, end: int, operator: Optional[int]) -> np.ndarray:
+        ts = self.ts[:self.size]
+        mask = (ts >= start) & (ts <= end)
+        if operator is not None:
+            mask &= self.operator[:self.size] == operator
+        return np.flatnonzero(mask)
+
+
+class HotWindow:
+    """Recent measurements held in memory, bounded by age and by a byte cap.
+
+    Buffers are reserved from `budget`: once it is spent existing series stop
+    growing and overwrite their oldest rows instead, which raises their floor,
+    and new series are turned away until expired rows free some room. Turned
+    away series are listed by `uncovered_series()` and read from the DB.
+    """
+
+    def __init__(self, hours: int, budget: MemoryBudget, series_capacity: int):
+        self.window_us = hours * 3600 * 1000 * 1000
+        self.budget = budget
+        self.series_capacity = series_capacity
+        self.processes = _Dictionary()
+        self.metrics = _Dictionary()
+        self.operators = _Dictionary()
+        self.units = _Dictionary()
+        self.series: Dict[Tuple[int, int], _Series] = {}
+        # Series turned away by the byte cap, with the newest timestamp they missed
+        self.uncovered: Dict[Tuple[int, int], int] = {}
+        self.nbytes = 0
+        # Rows older than this were never loaded, set when the window is warmed
+        self.floor = to_epoch_us(datetime.datetime.now(datetime.timezone.utc))
+        self.expired_at = self.floor
+        self._lock = threading.Lock()
+        budget.register(self)
+
+    def reset(self, since: datetime.datetime):
+        with self._lock:
+            self.series.clear()
+            self.uncovered.clear()
+            self.budget.release(self.nbytes)
+            self.nbytes = 0
+            self.floor = to_epoch_us(since)
+
+    def expire(self, now: Optional[int] = None):
+        """Drop rows older than the window and give their bytes back to the budget."""
+        if now is None:
+            now = to_epoch_us(datetime.datetime.now(datetime.timezone.utc))
+        with self._lock:
+            self._expire(now)
+
+    def _expire(self, now: int):
+        self.expired_at = now
+        horizon = now - self.window_us
+        freed = 0
+        for key, series in list(self.series.items()):
+            before = series.nbytes
+            series.drop_before(horizon)
+            if series.size == 0:
+                del self.series[key]
+                freed += before
+            else:
+                freed += before - series.nbytes
+        self.nbytes -= freed
+        self.budget.release(freed)
+        # A turned-away series whose missed rows all aged out is complete again
+        for key, missed in list(self.uncovered.items()):
+            if missed < horizon:
+                del self.uncovered[key]
+
+    def shrink_to(self, nbytes: int):
+        """Evict the least recently written series until at most `nbytes` are held.
+
+        Skipped if the window is busy, the caller then simply gets no room.
+        """
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            freed = 0
+            for key, series in sorted(self.series.items(), key=lambda item: item[1].newest()):
+                if self.nbytes - freed <= nbytes:
+                    break
+                del self.series[key]
+                self.uncovered[key] = series.newest()
+                freed += series.nbytes
+            self.nbytes -= freed
+            self.budget.release(freed)
+        finally:
+            self._lock.release()
+
+    def _maybe_expire(self, now: int):
+        if now - self.expired_at >= EXPIRE_INTERVAL_US:
+            self._expire(now)
+
+    def cutoff(self, process: Optional[str] = None, metric: Optional[str] = None) -> int:
+        """Earliest epoch-µs timestamp from which the window holds every row.
+
+        Only covers the series it holds; those in `uncovered_series()` must be
+        read from the DB over the whole range.
+        """
+        now = to_epoch_us(datetime.datetime.now(datetime.timezone.utc))
+        with self._lock:
+            self._maybe_expire(now)
+            cutoff = max(self.floor, now - self.window_us)
+            for _, series in self._matching(process, metric):
+                cutoff = max(cutoff, series.floor)
+        return cutoff
+
+    def uncovered_series(self, process: Optional[str] = None, metric: Optional[str] = None) -> List[Tuple[str, str]]:
+        """(process, metric) pairs matching the filters that the window turned away."""
+        with self._lock:
+            return [
+                (self.processes.names[key[0]], self.metrics.names[key[1]])
+                for key in self.uncovered if self._key_matches(key, process, metric)
+            ]
+
+    def _key_matches(self, key: Tuple[int, int], process: Optional[str], metric: Optional[str]) -> bool:
+        return (
+            (process is None or self.processes.names[key[0]] == process)
+            and (metric is None or self.metrics.names[key[1]] == metric)
+        )
+
+    def _matching(self, process: Optional[str], metric: Optional[str]) -> List[Tuple[Tuple[int, int], _Series]]:
+        process_code = self.processes.lookup(process) if process is not None else None
+        metric_code = self.metrics.lookup(metric) if metric is not None else None
+        if (process is not None and process_code is None) or (metric is not None and metric_code is None):
+            return []
+        return [
+            (key, series) for key, series in self.series.items()
+            if (process_code is None or key[0] == process_code) and (metric_code is None or key[1] == metric_code)
+        ]
+
+    def _series_for(self, key: Tuple[int, int], ts: int) -> Optional[_Series]:
+        series = self.series.get(key)
+        if series is None:
+            capacity = min(_MIN_CAPACITY, self.series_capacity)
+            if not self.budget.reserve(self, capacity * ROW_BYTES):
+                self.uncovered[key] = max(self.uncovered.get(key, ts), ts)
+                return None
+            series = _Series(capacity)
+            # A series let in after being turned away only holds what came later
+            missed = self.uncovered.pop(key, None)
+            if missed is not None:
+                series.floor = missed + 1
+            self.series[key] = series
+            self.nbytes += series.nbytes
+        elif series.size == series.capacity and series.capacity < self.series_capacity:
+            capacity = min(series.capacity * 2, self.series_capacity)
+            extra = (capacity - series.capacity) * ROW_BYTES
+            if self.budget.reserve(self, extra):
+                series.grow(capacity)
+                self.nbytes += extra
+        return series
+
+    def append(self, rows: List[dict]):
+        """Add measurements with `timestamp` as a datetime.
+
+        Rows below the floor or already outside the window are skipped.
+        """
+        now = to_epoch_us(datetime.datetime.now(datetime.timezone.utc))
+        with self._lock:
+            self._maybe_expire(now)
+            oldest = max(self.floor, now - self.window_us)
+            for row in rows:
+                ts = to_epoch_us(row["timestamp"])
+                if ts < oldest:
+                    continue
+                key = (self.processes.encode(row["process"]), self.metrics.encode(row["metric_name"]))
+                series = self._series_for(key, ts)
+                if series is None:
+                    continue
+                series.append(
+                    ts,
+                    row["value"],
+                    row["target"],
+                    self.operators.encode(row["operator"]),
+                    self.units.encode(row["unit"]),
+                )
+
+    def query(
+        self,
+        start: int,
+        end: int,
+        process: Optional[str] = None,
+        metric: Optional[str] = None,
+        operator: Optional[str] = None,
+    ) -> List[dict]:
+        """Rows in [start, end] (epoch µs) sorted by timestamp.
+
+        Callers should clamp `start` to `cutoff()`; rows before it may be missing.
+        """
+        with self._lock:
+            operator_code = None
+            if operator is not None:
+                operator_code = self.operators.lookup(operator)
+                if operator_code is None:
+                    return []
+
+            process_names = np.array(self.processes.names, dtype=object)
+            metric_names = np.array(self.metrics.names, dtype=object)
+            operator_names = np.array(self.operators.names, dtype=object)
+            unit_names = np.array(self.units.names, dtype=object)
+
+            columns = {"ts": [], "value": [], "target": [], "operator": [], "unit": [], "process": [], "metric": []}
+            for (p, m), series in self._matching(process, metric):
+                idx = series.select(start, end, operator_code)
+                if not len(idx):
+                    continue
+                columns["ts"].append(series.ts[idx])
+                columns["value"].append(series.value[idx])
+                columns["target"].append(series.target[idx])
+                columns["operator"].append(series.operator[idx])
+                columns["unit"].append(series.unit[idx])
+                columns["process"].append(np.full(len(idx), p, dtype=np.int32))
+                columns["metric"].append(np.full(len(idx), m, dtype=np.int32))
+
+            if not columns["ts"]:
+                return []
+            merged = {name: np.concatenate(parts) for name, parts in columns.items()}
+
+        order = np.argsort(merged["ts"], kind="stable")
+        ts = merged["ts"][order]
+        value = merged["value"][order]
+        target = merged["target"][order]
+        processes = process_names[merged["process"][order]]
+        metrics = metric_names[merged["metric"][order]]
+        operators = operator_names[merged["operator"][order]]
+        units = unit_names[merged["unit"][order]]
+        return [
+            {
+                "timestamp": from_epoch_us(int(ts[i])).isoformat(),
+                "metric_name": metrics[i],
+                "value": float(value[i]),
+                "target": float(target[i]),
+                "unit": units[i],
+                "process": processes[i],
+                "operator": operators[i],
+            }
+            for i in range(len(ts))
+        ]
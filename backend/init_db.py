@@ -1,6 +1,8 @@
 from database import engine, Base
 from models import User  # import your User model
+from tenancy import migrate_tenant_columns
 
 print("📦 Creating tables in Railway PostgreSQL...")
 Base.metadata.create_all(bind=engine)
+migrate_tenant_columns(engine)
 print("✅ Done! Tables created.")
@@ -1,5 +1,12 @@
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, Integer, Float, DateTime, Index, JSON
 from database import Base
+from config import DEFAULT_TENANT_ID
+
+class Tenant(Base):
+    __tablename__ = "tenants"
+
+    id = Column(String, primary_key=True)
+    name = Column(String)
 
 class User(Base):
     __tablename__ = "users"
@@ -9,3 +16,59 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     password = Column(String)
     role = Column(String)
+    tenant_id = Column(String, default=DEFAULT_TENANT_ID)
+
+    __table_args__ = (
+        Index("ix_users_tenant_role", "tenant_id", "role"),
+    )
+
+class QualityMeasurement(Base):
+    __tablename__ = "quality_measurements"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tenant_id = Column(String, default=DEFAULT_TENANT_ID)
+    timestamp = Column(DateTime) # Stored as naive UTC
+    metric_name = Column(String)
+    value = Column(Float)
+    target = Column(Float)
+    unit = Column(String)
+    process = Column(String)
+    operator = Column(String)
+    notes = Column(String)
+
+    __table_args__ = (
+        Index("ix_quality_measurements_tenant_ts", "tenant_id", "timestamp"),
+        Index("ix_quality_measurements_tenant_process_metric_ts", "tenant_id", "process", "metric_name", "timestamp"),
+    )
+
+class QuizQuestion(Base):
+    __tablename__ = "quiz_questions"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    topic = Column(String)
+    language = Column(String)
+    difficulty = Column(String)
+    question = Column(String)
+    options = Column(JSON)
+    correct_answer = Column(Integer)
+    explanation = Column(String)
+    source = Column(String) # "seed" or "gemini"
+
+    __table_args__ = (
+        Index("ix_quiz_questions_bank", "language", "topic", "difficulty", "id"),
+    )
+
+class QuizAttempt(Base):
+    __tablename__ = "quiz_attempts"
+
+    id = Column(String, primary_key=True)
+    tenant_id = Column(String, default=DEFAULT_TENANT_ID)
+    user_id = Column(String)
+    score = Column(Integer)
+    total = Column(Integer)
+    time_taken = Column(Integer) # Seconds
+    created_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_quiz_attempts_tenant_user_created", "tenant_id", "user_id", "created_at"),
+    )
@@ -0,0 +1,148 @@
+import json
+import os
+import hashlib
+from typing import List, Optional
+
+import google.generativeai as genai
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from config import GEMINI_API_KEY
+import models
+
+# Question banks are stored per (topic, language, difficulty). The bundled
+# seed catalogue is loaded on first start, and `python quiz.py` pre-generates
+# extra questions with Gemini in batch so students never wait on the LLM.
+
+TOPICS = ["Cp/Cpk", "5 Whys", "Fishbone", "Quality Management", "Quality Tools"]
+LANGUAGES = {"en": "English", "hi": "Hindi"}
+DIFFICULTIES = ["beginner", "intermediate", "advanced"]
+
+SEED_FILE = os.path.join(os.path.dirname(__file__), "quiz_seed.json")
+GENERATE_BATCH_SIZE = 20
+
+
+def seed_question_bank(db: Session) -> int:
+    """Load the bundled catalogue if the question table is empty."""
+    if db.query(models.QuizQuestion.id).first() is not None:
+        return 0
+    with open(SEED_FILE, encoding="utf-8") as f:
+        questions = json.load(f)
+    for question in questions:
+        question["source"] = "seed"
+    db.execute(insert(models.QuizQuestion), questions)
+    db.commit()
+    return len(questions)
+
+
+def bank_filters(topic: Optional[str], language: str, difficulty: Optional[str]) -> list:
+    filters = [models.QuizQuestion.language == language]
+    if topic is not None:
+        filters.append(models.QuizQuestion.topic == topic)
+    if difficulty is not None:
+        filters.append(models.QuizQuestion.difficulty == difficulty)
+    return filters
+
+
+def bank_etag(db: Session, filters: list, *key) -> str:
+    # Questions are insert-only, so count + max id identifies a bank's contents
+    count, max_id = db.execute(
+        select(func.count(models.QuizQuestion.id), func.max(models.QuizQuestion.id)).where(*filters)
+    ).one()
+    version = ":".join(str(part) for part in (count, max_id) + key)
+    return f'W/"{hashlib.md5(version.encode()).hexdigest()}"'
+
+
+def _build_prompt(topic: str, language: str, difficulty: str, count: int, existing: List[str]) -> str:
+    avoid = "\n".join(f"- {q}" for q in existing[:50])
+    return (
+        f"Write {count} {difficulty} multiple-choice quiz questions in {LANGUAGES[language]} "
+        f"about the quality engineering topic \"{topic}\" for students.\n"
+        "Return a JSON array where each item has: \"question\" (string), \"options\" "
+        "(array of exactly 4 strings), \"correct_answer\" (index 0-3 of the right option) "
+        "and \"explanation\" (one or two sentences).\n"
+        f"Do not repeat these existing questions:\n{avoid}"
+    )
+
+
+def _valid_question(item) -> bool:
+    return (
+        isinstance(item, dict)
+        and isinstance(item.get("question"), str)
+        and isinstance(item.get("options"), list)
+        and len(item["options"]) == 4
+        and all(isinstance(option, str) for option in item["options"])
+        and isinstance(item.get("correct_answer"), int)
+        and 0 <= item["correct_answer"] < 4
+        and isinstance(item.get("explanation"), str)
+    )
+
+
+def generate_question_bank(db: Session, model, topic: str, language: str, difficulty: str, count: int = GENERATE_BATCH_SIZE) -> int:
+    """Generate one batch of questions for a bank with a single Gemini call."""
+    existing = db.execute(
+        select(models.QuizQuestion.question).where(*bank_filters(topic, language, difficulty))
+    ).scalars().all()
+    response = model.generate_content(
+        _build_prompt(topic, language, difficulty, count, existing),
+        generation_config={"response_mime_type": "application/json"},
+    )
+    try:
+        items = json.loads(response.text)
+    except (ValueError, AttributeError):
+        return 0
+    if not isinstance(items, list):
+        return 0
+
+    seen = set(existing)
+    questions = []
+    for item in items:
+        if not _valid_question(item) or item["question"] in seen:
+            continue
+        seen.add(item["question"])
+        questions.append({
+            "topic": topic,
+            "language": language,
+            "difficulty": difficulty,
+            "question": item["question"],
+            "options": item["options"],
+            "correct_answer": item["correct_answer"],
+            "explanation": item["explanation"],
+            "source": "gemini",
+        })
+    if questions:
+        db.execute(insert(models.QuizQuestion), questions)
+        db.commit()
+    return len(questions)
+
+
+def main():
+    from database import SessionLocal, engine
+
+    if not GEMINI_API_KEY:
+        print("❌ GEMINI_API_KEY is not configured.")
+        return
+    models.Base.metadata.create_all(bind=engine)
+    genai.configure(api_key=GEMINI_API_KEY)
+    model = genai.GenerativeModel("gemini-1.5-flash")
+
+    db = SessionLocal()
+    try:
+        seed_question_bank(db)
+        for topic in TOPICS:
+            for language in LANGUAGES:
+                for difficulty in DIFFICULTIES:
+                    try:
+                        added = generate_question_bank(db, model, topic, language, difficulty)
+                    except Exception as e:
+                        db.rollback()
+                        print(f"❌ {topic} / {language} / {difficulty}: {e}")
+                        continue
+                    print(f"✅ {topic} / {language} / {difficulty}: {added} questions added")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    # Batch job: python quiz.py
+    main()
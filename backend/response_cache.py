@@ -0,0 +1,200 @@
+import functools
+import hashlib
+import inspect
+import threading
+import uuid
+from collections import OrderedDict, defaultdict
+from typing import Iterable, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, gzip is always available
+    brotli = None
+
+# Response layer for read endpoints: ETags derived from per-dataset version
+# counters (bumped by the write paths, never by hashing response bodies),
+# memoization keyed on the same counters, and gzip/brotli compression.
+
+
+class DataVersions:
+    """In-process version counters, one per dataset name."""
+
+    def __init__(self):
+        self._versions = defaultdict(int)
+        # Counters restart at 0, so ETags from a previous run must not match
+        self.boot = uuid.uuid4().hex
+        self._lock = threading.Lock()
+
+    def bump(self, name: str):
+        with self._lock:
+            self._versions[name] += 1
+
+    def snapshot(self, names: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self._versions[name] for name in names)
+
+    def etag(self, names: Iterable[str], *key) -> str:
+        version = ":".join(str(part) for part in (self.boot,) + self.snapshot(names) + key)
+        return f'W/"{hashlib.md5(version.encode()).hexdigest()}"'
+
+
+data_versions = DataVersions()
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def memoize(*names: str, maxsize: int = 128, weigh=None, max_weight: Optional[int] = None):
+    """Cache results until any of the named data versions is bumped.
+
+    Names may refer to the function's arguments, e.g. "measurements:{tenant_id}",
+    so each tenant's entries are only invalidated by that tenant's writes.
+    Session arguments are left out of the cache key. With `weigh`, e.g. len,
+    the entries together stay under `max_weight` and heavier results are not
+    cached at all.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        cache = OrderedDict()
+        lock = threading.Lock()
+        total = 0
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal total
+            arguments = signature.bind(*args, **kwargs).arguments
+            key = tuple((name, value) for name, value in arguments.items() if not isinstance(value, Session))
+            versions = data_versions.snapshot(name.format(**arguments) for name in names)
+            with lock:
+                entry = cache.get(key)
+                if entry is not None and entry[0] == versions:
+                    cache.move_to_end(key)
+                    return entry[1]
+
+            value = func(*args, **kwargs)
+            weight = weigh(value) if weigh is not None else 0
+            if max_weight is not None and weight > max_weight:
+                return value
+            with lock:
+                previous = cache.pop(key, None)
+                if previous is not None:
+                    total -= previous[2]
+                cache[key] = (versions, value, weight)
+                total += weight
+                while len(cache) > maxsize or (max_weight is not None and total > max_weight):
+                    _, evicted = cache.popitem(last=False)
+                    total -= evicted[2]
+            return value
+
+        def cache_clear():
+            nonlocal total
+            with lock:
+                cache.clear()
+                total = 0
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+
+def accepted_encodings(header: str) -> set:
+    """Encodings the client accepts, skipping any it refuses with q=0."""
+    accepted = set()
+    for part in header.split(","):
+        encoding, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if encoding and quality > 0:
+            accepted.add(encoding.strip().lower())
+    return accepted
+
+
+class CompressionMiddleware:
+    """Brotli when the client accepts it and the module is installed, gzip otherwise."""
+
+    def __init__(self, app, minimum_size: int = 1024, compresslevel: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size, compresslevel=compresslevel)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            await _BrotliResponder(self.app, self.minimum_size)(scope, receive, send)
+        elif "gzip" in accepted:
+            await self.gzip(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+class _BrotliResponder:
+    # Single-message bodies are compressed in one go when above the threshold,
+    # streamed bodies go through an incremental compressor chunk by chunk
+
+    def __init__(self, app, minimum_size: int):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.passthrough = False
+        self.compressor = None
+
+    async def __call__(self, scope, receive, send):
+        async def send_compressed(message):
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                self.passthrough = (
+                    "content-encoding" in headers
+                    or headers.get("content-type", "").startswith("text/event-stream")
+                )
+                if self.passthrough:
+                    await send(message)
+                else:
+                    self.start_message = message
+                return
+            if self.passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if self.compressor is None:
+                headers = MutableHeaders(raw=self.start_message["headers"])
+                if not more_body:
+                    if len(body) >= self.minimum_size:
+                        body = brotli.compress(body, quality=4)
+                        headers["Content-Encoding"] = "br"
+                        headers["Content-Length"] = str(len(body))
+                        headers.add_vary_header("Accept-Encoding")
+                    await send(self.start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+
+                self.compressor = brotli.Compressor(quality=4)
+                headers["Content-Encoding"] = "br"
+                del headers["Content-Length"]
+                headers.add_vary_header("Accept-Encoding")
+                await send(self.start_message)
+
+            chunk = self.compressor.process(body)
+            chunk += self.compressor.flush() if more_body else self.compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,75 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from config import DEFAULT_TENANT_ID, TENANT_DB_MODE, TENANT_SQLITE_DIR, TENANT_ENGINE_CACHE_SIZE
+from database import SessionLocal
+import models
+
+# Tenant routing. Users and tenants always live in the main database so login
+# can find them; tenant data tables either share it (scoped by tenant_id and
+# tenant-leading indexes) or, with TENANT_DB_MODE=sqlite, get one SQLite file
+# per tenant so a plant's queries never touch another plant's rows.
+
+TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+TENANT_TABLES = [models.QualityMeasurement.__table__, models.QuizAttempt.__table__]
+
+# Least recently used tenant engines are disposed, so open files and pools
+# stay bounded however many tenants sign up
+_tenant_sessions: "OrderedDict[str, sessionmaker]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def migrate_tenant_columns(bind):
+    """Add tenant_id and its indexes to tables created before tenancy existed."""
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    for table in models.Base.metadata.sorted_tables:
+        if "tenant_id" not in table.c or table.name not in existing_tables:
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        if "tenant_id" not in columns:
+            with bind.begin() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN tenant_id VARCHAR DEFAULT '{DEFAULT_TENANT_ID}'"
+                ))
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
+def ensure_default_tenant(db: Session):
+    if db.query(models.Tenant).filter(models.Tenant.id == DEFAULT_TENANT_ID).first() is None:
+        db.add(models.Tenant(id=DEFAULT_TENANT_ID, name="Default"))
+        db.commit()
+
+
+def tenant_session(tenant_id: str) -> Session:
+    """Session for a tenant's data tables."""
+    if TENANT_DB_MODE != "sqlite":
+        return SessionLocal()
+    if not TENANT_ID_PATTERN.match(tenant_id):
+        raise ValueError(f"Invalid tenant id: {tenant_id}")
+
+    with _lock:
+        factory = _tenant_sessions.get(tenant_id)
+        if factory is None:
+            os.makedirs(TENANT_SQLITE_DIR, exist_ok=True)
+            tenant_engine = create_engine(
+                f"sqlite:///{os.path.join(TENANT_SQLITE_DIR, tenant_id)}.db",
+                connect_args={"check_same_thread": False},
+            )
+            models.Base.metadata.create_all(bind=tenant_engine, tables=TENANT_TABLES)
+            factory = sessionmaker(autocommit=False, autoflush=False, bind=tenant_engine)
+            _tenant_sessions[tenant_id] = factory
+            while len(_tenant_sessions) > TENANT_ENGINE_CACHE_SIZE:
+                _, evicted = _tenant_sessions.popitem(last=False)
+                # Checked-out connections keep working and are closed when returned
+                evicted.kw["bind"].dispose()
+        else:
+            _tenant_sessions.move_to_end(tenant_id)
+    return factory()
@@ -3,8 +3,9 @@ from httpx import AsyncClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from backend.database import Base
-from backend.app import app, get_db, SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_SECRET_KEY, REFRESH_TOKEN_EXPIRE_MINUTES
+from backend.app import app, get_db, warm_hot_window, ConnectionManager, SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_SECRET_KEY, REFRESH_TOKEN_EXPIRE_MINUTES
 from backend import models
+from backend.quiz import seed_question_bank
 from datetime import datetime, timedelta
 import jwt
 import os
@@ -68,7 +69,7 @@ def create_test_refresh_token(user_id: str):
 async def test_signup(client: AsyncClient, db_session: Session):
     response = await client.post(
         "/signup",
-        json={"name": "Test User", "email": "test@example.com", "password": "password123", "role": "msme"}
+        json={"name": "Test User", "email": "test@example.com", "password": "password123", "role": "msme", "plant": "Test Plant"}
     )
     assert response.status_code == 200
     data = response.json()
@@ -85,11 +86,21 @@ async def test_signup_existing_email(client: AsyncClient, db_session: Session):
     create_test_user(db_session)
     response = await client.post(
         "/signup",
-        json={"name": "Test User 2", "email": "test@example.com", "password": "password456", "role": "engineer"}
+        json={"name": "Test User 2", "email": "test@example.com", "password": "password456", "role": "engineer", "plant": "Test Plant"}
     )
     assert response.status_code == 400
     assert response.json()["detail"] == "Email already registered"
 
+@pytest.mark.asyncio
+async def test_signup_requires_plant(client: AsyncClient, db_session: Session):
+    response = await client.post(
+        "/signup",
+        json={"name": "Test User", "email": "test@example.com", "password": "password123", "role": "student"}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Plant name is required"
+    assert db_session.query(models.User).filter(models.User.email == "test@example.com").first() is None
+
 # Test for login endpoint
 @pytest.mark.asyncio
 async def test_login(client: AsyncClient, db_session: Session):
@@ -206,3 +217,219 @@ async def test_root(client: AsyncClient):
     response = await client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "QualityBot AI Backend is running!"}
+
+# Test for dashboard metrics served from the hot window
+@pytest.mark.asyncio
+async def test_metrics_after_import(client: AsyncClient, db_session: Session):
+    warm_hot_window(db_session, "default")
+    user = create_test_user(db_session, email="metrics@example.com")
+    headers = {"Authorization": f"Bearer {create_test_access_token(user.id)}"}
+    now = datetime.utcnow()
+    csv = "timestamp,metric_name,value,target,unit,process,operator,notes\n"
+    csv += f"{(now - timedelta(hours=1)).isoformat()},Defect Rate,1.5,2,%,Assembly,op1,\n"
+    csv += f"{(now - timedelta(days=30)).isoformat()},Defect Rate,2.5,2,%,Assembly,op2,\n"
+    response = await client.post("/import-excel", files={"file": ("data.csv", csv, "text/csv")}, headers=headers)
+    assert response.status_code == 200
+    assert db_session.query(models.QualityMeasurement).count() == 2
+
+    response = await client.get("/metrics", params={"process": "Assembly", "start": (now - timedelta(days=40)).isoformat()}, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [row["value"] for row in data["rows"]] == [2.5, 1.5]
+    assert data["memory_rows"] == 1
+    assert data["database_rows"] == 1
+
+# Test for quiz question banks and server-side scoring
+@pytest.mark.asyncio
+async def test_quiz_questions_and_attempt(client: AsyncClient, db_session: Session):
+    seed_question_bank(db_session)
+    response = await client.get("/quiz/questions", params={"topic": "Cp/Cpk", "limit": 3})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["questions"]) == 3
+    assert data["next_cursor"] == data["questions"][-1]["id"]
+    assert "correct_answer" not in data["questions"][0]
+
+    cached = await client.get(
+        "/quiz/questions",
+        params={"topic": "Cp/Cpk", "limit": 3},
+        headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert cached.status_code == 304
+
+    user = create_test_user(db_session, email="quiz@example.com", role="student")
+    question = db_session.query(models.QuizQuestion).get(data["questions"][0]["id"])
+    response = await client.post(
+        "/quiz/attempts",
+        json={"answers": [{"question_id": question.id, "answer": question.correct_answer}], "time_taken": 42},
+        headers={"Authorization": f"Bearer {create_test_access_token(user.id)}"}
+    )
+    assert response.status_code == 200
+    assert response.json()["score"] == 1
+    assert db_session.query(models.QuizAttempt).filter(models.QuizAttempt.user_id == user.id).count() == 1
+
+@pytest.mark.asyncio
+async def test_quiz_sample(client: AsyncClient, db_session: Session):
+    seed_question_bank(db_session)
+    response = await client.get("/quiz/sample", params={"topic": "Cp/Cpk", "count": 3})
+    assert response.status_code == 200
+    questions = response.json()
+    assert len(questions) == 3
+    assert len({q["id"] for q in questions}) == 3
+    assert all(q["topic"] == "Cp/Cpk" and "correct_answer" not in q for q in questions)
+
+    response = await client.get("/quiz/sample", params={"topic": "Unknown"})
+    assert response.json() == []
+
+@pytest.mark.asyncio
+async def test_quiz_attempt_validation(client: AsyncClient, db_session: Session):
+    seed_question_bank(db_session)
+    user = create_test_user(db_session, email="quizcheck@example.com", role="student")
+    headers = {"Authorization": f"Bearer {create_test_access_token(user.id)}"}
+    question = db_session.query(models.QuizQuestion).first()
+
+    response = await client.post(
+        "/quiz/attempts",
+        json={"answers": [{"question_id": question.id, "answer": question.correct_answer}] * 2, "time_taken": 10},
+        headers=headers
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Duplicate question id"
+
+    response = await client.post(
+        "/quiz/attempts",
+        json={"answers": [{"question_id": question.id, "answer": len(question.options)}], "time_taken": 10},
+        headers=headers
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Answer out of range"
+
+    response = await client.post(
+        "/quiz/attempts",
+        json={"answers": [{"question_id": question.id, "answer": 0}], "time_taken": -5},
+        headers=headers
+    )
+    assert response.status_code == 422
+
+# Test for metric ETags derived from the measurement data version
+@pytest.mark.asyncio
+async def test_metrics_etag(client: AsyncClient, db_session: Session):
+    warm_hot_window(db_session, "default")
+    user = create_test_user(db_session, email="etag@example.com")
+    headers = {"Authorization": f"Bearer {create_test_access_token(user.id)}"}
+    csv = "timestamp,metric_name,value,target,unit,process,operator,notes\n"
+    csv += f"{datetime.utcnow().isoformat()},Yield,98,99,%,Paint,op1,\n"
+    await client.post("/import-excel", files={"file": ("data.csv", csv, "text/csv")}, headers=headers)
+
+    response = await client.get("/metrics", params={"process": "Paint"}, headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    cached = await client.get("/metrics", params={"process": "Paint"}, headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+
+    # The import bumps the data version, which drops the memoized result and the ETag
+    await client.post("/import-excel", files={"file": ("data.csv", csv, "text/csv")}, headers=headers)
+    response = await client.get("/metrics", params={"process": "Paint"}, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["rows"]) == 2
+
+# Test for bulk user provisioning
+@pytest.mark.asyncio
+async def test_bulk_create_users(client: AsyncClient, db_session: Session):
+    owner = create_test_user(db_session, email="owner@example.com", role="msme")
+    create_test_user(db_session, email="taken@example.com", role="student")
+    users = [
+        {"name": "Op 1", "email": "op1@example.com", "password": "pw1", "role": "student"},
+        {"name": "Op 2", "email": "taken@example.com", "password": "pw2", "role": "student"},
+        {"name": "Op 3", "email": "op1@example.com", "password": "pw3", "role": "student"},
+    ]
+    response = await client.post(
+        "/users/bulk",
+        json={"users": users},
+        headers={"Authorization": f"Bearer {create_test_access_token(owner.id)}"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 1
+    assert [r["success"] for r in data["results"]] == [True, False, False]
+    assert data["results"][0]["user"]["access_token"]
+    assert data["results"][1]["detail"] == "Email already registered"
+    assert db_session.query(models.User).filter(models.User.email == "op1@example.com").count() == 1
+
+@pytest.mark.asyncio
+async def test_bulk_create_users_reports_invalid_rows(client: AsyncClient, db_session: Session):
+    owner = create_test_user(db_session, email="owner@example.com", role="msme")
+    users = [
+        {"name": "Op 1", "email": "op1@example.com", "role": "student"},
+        {"name": "Op 2", "email": "op2@example.com", "password": "pw2", "role": "student"},
+    ]
+    response = await client.post(
+        "/users/bulk",
+        json={"users": users},
+        headers={"Authorization": f"Bearer {create_test_access_token(owner.id)}"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 1
+    assert [r["success"] for r in data["results"]] == [False, True]
+    assert data["results"][0]["detail"].startswith("Invalid row")
+
+@pytest.mark.asyncio
+async def test_bulk_create_users_forbidden(client: AsyncClient, db_session: Session):
+    student = create_test_user(db_session, email="student@example.com", role="student")
+    response = await client.post(
+        "/users/bulk",
+        json={"users": []},
+        headers={"Authorization": f"Bearer {create_test_access_token(student.id)}"}
+    )
+    assert response.status_code == 403
+
+# Test that one failing WebSocket doesn't stop a broadcast
+@pytest.mark.asyncio
+async def test_broadcast_drops_failed_connections():
+    class FakeSocket:
+        def __init__(self, fail=False):
+            self.fail = fail
+            self.sent = []
+
+        async def send_text(self, message):
+            if self.fail:
+                raise RuntimeError("Client went away")
+            self.sent.append(message)
+
+    manager = ConnectionManager()
+    gone, alive = FakeSocket(fail=True), FakeSocket()
+    manager.active_connections["default"] = [gone, alive]
+
+    await manager.broadcast("update", "default")
+    assert alive.sent == ["update"]
+    assert manager.active_connections["default"] == [alive]
+
+# Test that measurements stay inside their tenant
+@pytest.mark.asyncio
+async def test_metrics_tenant_isolation(client: AsyncClient, db_session: Session):
+    warm_hot_window(db_session, "default")
+    response = await client.post(
+        "/signup",
+        json={"name": "Plant Owner", "email": "owner@plant.example", "password": "pw", "role": "msme", "plant": "Pune Plant"}
+    )
+    plant = response.json()
+    assert plant["tenant_id"] != "default"
+    assert jwt.decode(plant["access_token"], SECRET_KEY, algorithms=[ALGORITHM])["tenant"] == plant["tenant_id"]
+
+    csv = "timestamp,metric_name,value,target,unit,process,operator,notes\n"
+    csv += f"{datetime.utcnow().isoformat()},Yield,97,99,%,Welding,op1,\n"
+    plant_headers = {"Authorization": f"Bearer {plant['access_token']}"}
+    await client.post("/import-excel", files={"file": ("data.csv", csv, "text/csv")}, headers=plant_headers)
+
+    response = await client.get("/metrics", params={"process": "Welding"}, headers=plant_headers)
+    assert len(response.json()["rows"]) == 1
+    assert response.json()["memory_rows"] == 1
+
+    other = create_test_user(db_session, email="other@example.com")
+    response = await client.get(
+        "/metrics",
+        params={"process": "Welding"},
+        headers={"Authorization": f"Bearer {create_test_access_token(other.id)}"}
+    )
+    assert response.json()["rows"] == []
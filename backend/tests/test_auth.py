@@ -27,7 +27,8 @@ def test_signup():
             "name": "Test User",
             "email": "test@example.com",
             "password": "testpass123",
-            "role": "student"
+            "role": "student",
+            "plant": "Test Plant"
         }
         
         response = requests.post(f"{BASE_URL}/signup", json=signup_data)
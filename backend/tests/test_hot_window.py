@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+from backend.hot_window import HotWindow, MemoryBudget, ROW_BYTES, to_epoch_us
+
+def make_row(ts, process="Assembly", metric="Defect Rate", value=1.0, operator="op1"):
+    return {"timestamp": ts, "process": process, "metric_name": metric, "value": value, "target": 2.0, "operator": operator, "unit": "%"}
+
+def make_window(max_bytes=64 * 1024 * 1024, series_capacity=1000, budget=None):
+    window = HotWindow(hours=24, budget=budget or MemoryBudget(max_bytes), series_capacity=series_capacity)
+    window.reset(datetime.now(timezone.utc) - timedelta(hours=24))
+    return window
+
+def test_query_filters_and_sorts():
+    window = make_window()
+    now = datetime.now(timezone.utc)
+    window.append([
+        make_row(now - timedelta(minutes=1), value=2.0, operator="op2"),
+        make_row(now - timedelta(minutes=5), value=1.0),
+        make_row(now - timedelta(minutes=3), process="Paint", value=3.0),
+    ])
+    start = window.cutoff()
+    end = to_epoch_us(now)
+
+    assert [row["value"] for row in window.query(start, end)] == [1.0, 3.0, 2.0]
+    assert [row["value"] for row in window.query(start, end, process="Assembly")] == [1.0, 2.0]
+    assert [row["value"] for row in window.query(start, end, operator="op2")] == [2.0]
+    assert window.query(start, end, process="Unknown") == []
+
+def test_ring_overwrite_raises_floor():
+    window = make_window(series_capacity=64)
+    now = datetime.now(timezone.utc)
+    rows = [make_row(now - timedelta(minutes=100 - i), value=float(i)) for i in range(70)]
+    window.append(rows)
+
+    # The six oldest rows were overwritten, so only the rest is covered
+    assert window.cutoff("Assembly") == to_epoch_us(rows[5]["timestamp"]) + 1
+    held = window.query(window.cutoff("Assembly"), to_epoch_us(now), process="Assembly")
+    assert [row["value"] for row in held] == [float(i) for i in range(6, 70)]
+
+def test_byte_cap_turns_away_new_series():
+    window = make_window(max_bytes=10_000)
+    now = datetime.now(timezone.utc)
+    window.append([make_row(now - timedelta(minutes=1), process=f"Line {i}") for i in range(1000)])
+
+    assert window.nbytes <= 10_000
+    assert len(window.series) == 10_000 // (64 * ROW_BYTES)
+    assert window.uncovered_series("Line 0") == []
+    assert window.uncovered_series("Line 999") == [("Line 999", "Defect Rate")]
+    # Only the turned-away series go to the DB, the rest is still served from memory
+    assert len(window.uncovered_series()) == 1000 - len(window.series)
+    assert len(window.query(window.cutoff(), to_epoch_us(now))) == len(window.series)
+
+def test_expired_rows_free_the_budget():
+    window = make_window(max_bytes=10_000)
+    now = datetime.now(timezone.utc)
+    window.append([make_row(now - timedelta(hours=23), process=f"Line {i}") for i in range(1000)])
+    assert window.uncovered_series("Line 999")
+
+    # Two hours later every row has aged out of the 24h window
+    window.expire(to_epoch_us(now + timedelta(hours=2)))
+    assert window.series == {}
+    assert window.nbytes == 0 and window.budget.used == 0
+    assert window.uncovered_series() == []
+
+    window.append([make_row(now, process="Line 999")])
+    assert window.uncovered_series() == []
+    assert len(window.query(window.cutoff("Line 999"), to_epoch_us(now), process="Line 999")) == 1
+
+def test_turned_away_series_retried_once_bytes_are_free():
+    window = make_window(max_bytes=64 * ROW_BYTES)
+    now = datetime.now(timezone.utc)
+    window.append([
+        make_row(now - timedelta(hours=23), process="Old"),
+        make_row(now - timedelta(minutes=30), process="New"),
+    ])
+    assert window.uncovered_series() == [("New", "Defect Rate")]
+
+    window.expire(to_epoch_us(now + timedelta(hours=2)))
+    window.append([make_row(now - timedelta(minutes=10), process="New")])
+
+    # The row missed while turned away stays in the DB, the window covers what came after
+    assert window.uncovered_series() == []
+    assert window.cutoff("New") == to_epoch_us(now - timedelta(minutes=30)) + 1
+
+def test_windows_share_one_budget():
+    budget = MemoryBudget(10_000)
+    first = make_window(budget=budget)
+    second = make_window(budget=budget)
+    now = datetime.now(timezone.utc)
+    first.append([make_row(now - timedelta(minutes=1000 - i), process=f"Line {i}") for i in range(1000)])
+    assert budget.used == first.nbytes <= 10_000
+
+    # A later tenant still gets its share, taken from the first tenant's coldest series
+    second.append([make_row(now - timedelta(minutes=1))])
+    assert second.uncovered_series() == []
+    assert len(second.query(second.cutoff(), to_epoch_us(now))) == 1
+    assert first.nbytes <= budget.share()
+    assert budget.used == first.nbytes + second.nbytes <= 10_000
+    assert first.uncovered_series("Line 0") == [("Line 0", "Defect Rate")]
+    assert first.uncovered_series("Line 3") == []
+
+    first.reset(now - timedelta(hours=24))
+    assert budget.used == second.nbytes
+
+def test_timestamps_keep_microseconds():
+    window = make_window()
+    ts = datetime.now(timezone.utc).replace(microsecond=123456) - timedelta(minutes=1)
+    window.append([make_row(ts)])
+
+    end = to_epoch_us(ts)
+    assert window.query(window.cutoff(), end)[0]["timestamp"] == ts.isoformat()
+    assert window.query(window.cutoff(), end - 1) == []
@@ -0,0 +1,110 @@
+import gzip
+import brotli
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from backend.response_cache import CompressionMiddleware, DataVersions, accepted_encodings, data_versions, memoize
+
+LARGE_BODY = "quality " * 500
+
+compressed_app = FastAPI()
+compressed_app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+@compressed_app.get("/large")
+async def large():
+    return PlainTextResponse(LARGE_BODY)
+
+@compressed_app.get("/small")
+async def small():
+    return PlainTextResponse("ok")
+
+@compressed_app.get("/stream")
+async def stream():
+    async def chunks():
+        for _ in range(5):
+            yield LARGE_BODY
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+client = TestClient(compressed_app)
+
+def raw_get(path, accept_encoding):
+    # Fetch without letting the client decode, to check the bytes on the wire
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+def test_brotli_compression():
+    response, body = raw_get("/large", "gzip, br")
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(body).decode() == LARGE_BODY
+
+def test_gzip_compression():
+    response, body = raw_get("/large", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(body).decode() == LARGE_BODY
+
+def test_brotli_refused_with_zero_quality():
+    response, _ = raw_get("/large", "br;q=0, gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    response, body = raw_get("/large", "br;q=0")
+    assert "content-encoding" not in response.headers
+    assert body.decode() == LARGE_BODY
+
+def test_below_threshold_not_compressed():
+    response, body = raw_get("/small", "br, gzip")
+    assert "content-encoding" not in response.headers
+    assert body == b"ok"
+
+def test_streaming_brotli():
+    response, body = raw_get("/stream", "br")
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(body).decode() == LARGE_BODY * 5
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip;q=0.5, br;q=0, deflate") == {"gzip", "deflate"}
+
+def test_etag_changes_with_version():
+    versions = DataVersions()
+    etag = versions.etag(["measurements:default"], "Assembly")
+    assert versions.etag(["measurements:default"], "Assembly") == etag
+    versions.bump("measurements:default")
+    assert versions.etag(["measurements:default"], "Assembly") != etag
+
+def test_memoize_invalidated_by_bump():
+    calls = []
+
+    @memoize("memo-test:{tenant_id}")
+    def compute(tenant_id, value):
+        calls.append((tenant_id, value))
+        return len(calls)
+
+    assert compute("a", 1) == 1
+    assert compute("a", 1) == 1
+    assert compute("b", 1) == 2
+
+    data_versions.bump("memo-test:a")
+    assert compute("a", 1) == 3
+    assert compute("b", 1) == 2
+
+def test_memoize_bounded_by_weight():
+    calls = []
+
+    @memoize("memo-weight", weigh=len, max_weight=5)
+    def rows(count):
+        calls.append(count)
+        return list(range(count))
+
+    rows(3)
+    rows(2)
+    rows(3)
+    assert calls == [3, 2]
+
+    # Adding a third entry pushes the total over 5 and evicts the least recently used
+    rows(1)
+    rows(3)
+    rows(2)
+    assert calls == [3, 2, 1, 2]
+
+    # Results heavier than the bound are never cached
+    rows(6)
+    rows(6)
+    assert calls == [3, 2, 1, 2, 6, 6]
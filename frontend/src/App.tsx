@@ -120,6 +120,7 @@ function App() {
   const [signupName, setSignupName] = useState("");
   const [signupEmail, setSignupEmail] = useState("");
   const [signupRole, setSignupRole] = useState<User["role"]>("student");
+  const [signupPlant, setSignupPlant] = useState("");
   const [signupPassword, setSignupPassword] = useState("");
   const [authError, setAuthError] = useState<string | null>(null);
 
@@ -339,12 +340,13 @@ function App() {
   const handleSignupSubmit = async () => {
     setAuthError(null);
     try {
-      const user = await authService.signup(
-        signupName,
-        signupEmail,
-        signupRole,
-        signupPassword
-      );
+      const { user } = await authService.signup({
+        name: signupName,
+        email: signupEmail,
+        password: signupPassword,
+        role: signupRole,
+        plant: signupPlant,
+      });
       handleLogin(user);
       setShowSignup(false);
     } catch (error: any) {
@@ -956,6 +958,13 @@ function App() {
                 value={signupEmail}
                 onChange={(e) => setSignupEmail(e.target.value)}
               />
+              <input
+                type="text"
+                placeholder="Plant / Organisation"
+                className="w-full p-3 bg-black/30 border border-blue-500/30 rounded-lg text-gray-200 placeholder-gray-400 text-sm sm:text-base"
+                value={signupPlant}
+                onChange={(e) => setSignupPlant(e.target.value)}
+              />
               <select
                 className="w-full p-3 bg-black/30 border border-blue-500/30 rounded-lg text-gray-200 text-sm sm:text-base"
                 title="Select your role"
@@ -13,6 +13,7 @@ import { authService } from "../services/authService";
 vi.mock("../services/authService", () => ({
   authService: {
     getAuthHeaders: vi.fn(() => ({ Authorization: "Bearer test-token" })),
+    getToken: vi.fn(() => "test-token"),
   },
 }));
 
@@ -114,7 +115,7 @@ describe("MSMEDashboard", () => {
         onLanguageChange={mockOnLanguageChange}
       />
     );
-    expect(mockWebSocket).toHaveBeenCalledWith("ws://localhost:8000/ws");
+    expect(mockWebSocket).toHaveBeenCalledWith("ws://localhost:8000/ws?token=test-token");
   });
 
   it("handles incoming WebSocket messages", async () => {
@@ -34,6 +34,7 @@ import {
   Shield,
 } from "lucide-react";
 import { User as AppUser } from "../App";
+import { authService } from "../services/authService";
 import { LineChart, BarChart, PieChart } from "./QualityCharts";
 
 const API_BASE_URL =
@@ -85,6 +86,8 @@ export const MSMEDashboard: React.FC<MSMEDashboardProps> = ({
     importedRows: number;
   } | null>(null);
   const [erpMetrics, setErpMetrics] = useState<any>(null);
+  const [recentMeasurements, setRecentMeasurements] = useState<any[]>([]);
+  const metricsEtag = useRef<string | null>(null);
 
   // ROI Calculator State
   const [roiInputs, setRoiInputs] = useState({
@@ -113,6 +116,7 @@ export const MSMEDashboard: React.FC<MSMEDashboardProps> = ({
       setIsLoadingApi(true); // Set loading state
       const response = await fetch(`${API_BASE_URL}/import-excel`, {
         method: "POST",
+        headers: authService.getAuthHeaders(),
         body: formData,
       });
 
@@ -174,6 +178,27 @@ export const MSMEDashboard: React.FC<MSMEDashboardProps> = ({
     }
   };
 
+  // Last 24h of imported measurements for this plant; the ETag turns
+  // refetches with no new data into an empty 304
+  const fetchRecentMeasurements = async () => {
+    try {
+      const headers: Record<string, string> = { ...authService.getAuthHeaders() };
+      if (metricsEtag.current) {
+        headers["If-None-Match"] = metricsEtag.current;
+      }
+      const response = await fetch(`${API_BASE_URL}/metrics`, { headers });
+      if (response.status === 304) return;
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+      metricsEtag.current = response.headers?.get("ETag") ?? null;
+      const data = await response.json();
+      setRecentMeasurements(data.rows ?? []);
+    } catch (error) {
+      console.error("Failed to fetch recent measurements:", error);
+    }
+  };
+
   const fetchErpMetrics = async () => {
     try {
       setIsLoadingApi(true); // Set loading state
@@ -246,14 +271,17 @@ export const MSMEDashboard: React.FC<MSMEDashboardProps> = ({
     },
   };
 
-  // Fetch ERP metrics on component mount
+  // Fetch ERP metrics and recent measurements on component mount
   useEffect(() => {
     fetchErpMetrics();
+    fetchRecentMeasurements();
   }, []);
 
   // WebSocket Connection
   useEffect(() => {
-    const websocket = new WebSocket(`${WS_BASE_URL}/ws`);
+    // Updates are scoped to the user's plant, identified by the access token
+    const token = authService.getToken();
+    const websocket = new WebSocket(`${WS_BASE_URL}/ws?token=${encodeURIComponent(token ?? "")}`);
 
     websocket.onopen = () => {
       console.log("WebSocket Connected");
@@ -282,6 +310,7 @@ export const MSMEDashboard: React.FC<MSMEDashboardProps> = ({
             message: parsedData.message,
             importedRows: parsedData.imported_rows || 0,
           });
+          fetchRecentMeasurements();
         }
       } catch (e) {
         console.error("Error parsing WebSocket message", e);
@@ -1319,6 +1348,69 @@ export const MSMEDashboard: React.FC<MSMEDashboardProps> = ({
             <h2 className="text-xl sm:text-2xl font-bold text-purple-300 mb-4">
               {currentT.qualityMetrics}
             </h2>
+
+            {/* Recent Measurements from /metrics */}
+            <div className="bg-black/20 backdrop-blur-md rounded-xl border border-purple-500/30 p-4 sm:p-6">
+              <h3 className="text-lg font-semibold text-purple-300 mb-3">
+                Recent Measurements (Last 24 Hours)
+              </h3>
+              {recentMeasurements.length === 0 ? (
+                <p className="text-gray-400 text-sm">
+                  No measurements in the last 24 hours. Import a file to see them here.
+                </p>
+              ) : (
+                <div className="overflow-x-auto">
+                  <table className="w-full text-sm">
+                    <thead>
+                      <tr className="border-b border-purple-500/30">
+                        <th className="text-left p-2 text-purple-300">
+                          Timestamp
+                        </th>
+                        <th className="text-left p-2 text-purple-300">
+                          Metric
+                        </th>
+                        <th className="text-left p-2 text-purple-300">Value</th>
+                        <th className="text-left p-2 text-purple-300">
+                          Target
+                        </th>
+                        <th className="text-left p-2 text-purple-300">
+                          Process
+                        </th>
+                        <th className="text-left p-2 text-purple-300">
+                          Operator
+                        </th>
+                      </tr>
+                    </thead>
+                    <tbody>
+                      {recentMeasurements
+                        .slice(-20)
+                        .reverse()
+                        .map((row, index) => (
+                          <tr
+                            key={row.timestamp + index}
+                            className="border-b border-purple-500/20"
+                          >
+                            <td className="p-2 text-gray-300">
+                              {new Date(row.timestamp).toLocaleString()}
+                            </td>
+                            <td className="p-2 text-gray-300">
+                              {row.metric_name}
+                            </td>
+                            <td className="p-2 text-gray-300">
+                              {row.value} {row.unit}
+                            </td>
+                            <td className="p-2 text-gray-300">
+                              {row.target} {row.unit}
+                            </td>
+                            <td className="p-2 text-gray-300">{row.process}</td>
+                            <td className="p-2 text-gray-300">{row.operator}</td>
+                          </tr>
+                        ))}
+                    </tbody>
+                  </table>
+                </div>
+              )}
+            </div>
             <div className="grid grid-cols-1 lg:grid-cols-2 gap-4 sm:gap-6">
               {/* Sample Line Chart: Defect Rate Trend */}
               <LineChart
@@ -35,6 +35,7 @@ export const WelcomePage: React.FC<WelcomePageProps> = ({ onLogin }) => {
     password: "",
     confirmPassword: "",
     role: "student" as const,
+    plant: "",
   });
 
   const [error, setError] = useState("");
@@ -89,12 +90,19 @@ export const WelcomePage: React.FC<WelcomePageProps> = ({ onLogin }) => {
       return;
     }
 
+    if (!signupForm.plant.trim()) {
+      setError("Plant / organisation name is required");
+      setIsLoading(false);
+      return;
+    }
+
     try {
       const userData: SignupData = {
         name: signupForm.name.trim(),
         email: signupForm.email.toLowerCase().trim(),
         password: signupForm.password,
         role: signupForm.role,
+        plant: signupForm.plant.trim(),
       };
 
       await authService.signup(userData);
@@ -135,6 +143,7 @@ export const WelcomePage: React.FC<WelcomePageProps> = ({ onLogin }) => {
       password: "",
       confirmPassword: "",
       role: "student",
+      plant: "",
     });
     setError("");
     setSuccess("");
@@ -437,6 +446,22 @@ export const WelcomePage: React.FC<WelcomePageProps> = ({ onLogin }) => {
                 />
               </div>
 
+              <div>
+                <label className="block text-xs sm:text-sm font-medium text-gray-300 mb-2">
+                  Plant / Organisation
+                </label>
+                <input
+                  type="text"
+                  value={signupForm.plant}
+                  onChange={(e) =>
+                    setSignupForm({ ...signupForm, plant: e.target.value })
+                  }
+                  placeholder="Enter your plant or organisation name"
+                  className="w-full p-3 bg-black/30 border border-blue-500/30 rounded-lg text-gray-200 placeholder-gray-400 focus:outline-none focus:ring-2 focus:ring-blue-500/50 text-sm sm:text-base"
+                  required
+                />
+              </div>
+
               <div>
                 <label className="block text-xs sm:text-sm font-medium text-gray-300 mb-2">
                   Role
@@ -25,6 +25,7 @@ export interface SignupData {
   email: string;
   password: string;
   role: string;
+  plant: string; // Each signup starts a new plant; colleagues are added via bulk provisioning
 }
 
 export interface AuthResponse {
@@ -93,7 +94,7 @@ class AuthService {
       const data = await response.json();
 
       // Store token and user data
-      this.setToken(data.token);
+      this.setToken(data.access_token);
       this.setUser({
         id: data.id,
         name: data.name,
@@ -108,7 +109,7 @@ class AuthService {
           email: data.email,
           role: data.role,
         },
-        token: data.token,
+        token: data.access_token,
       };
     } catch (error) {
       console.error("Login error:", error);
@@ -135,7 +136,7 @@ class AuthService {
       const data = await response.json();
 
       // Store token and user data
-      this.setToken(data.token);
+      this.setToken(data.access_token);
       this.setUser({
         id: data.id,
         name: data.name,
@@ -150,7 +151,7 @@ class AuthService {
           email: data.email,
           role: data.role,
         },
-        token: data.token,
+        token: data.access_token,
       };
     } catch (error) {
       console.error("Signup error:", error);